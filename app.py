@@ -2,45 +2,109 @@
 # IMPORTS
 # --------------------------------------------------
 import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, YouTubeRequestFailed, RequestBlocked
+from google.api_core import exceptions as google_exceptions
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 import re
 import json
-import time
+import asyncio
+import datetime
+import threading
+import queue
+from contextlib import contextmanager
 import streamlit as st  # <-- ADD THIS IMPORT
+from diskcache import Cache
+# uvloop is optional (not available on Windows); it gives asyncio a faster event loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+from transcript_utils import get_video_id, chunk_text
+from llm_cache import get_cached_chunk_summary, cache_chunk_summary
 
 # --------------------------------------------------
 # ALL YOUR HELPER FUNCTIONS (No changes needed)
 # --------------------------------------------------
 
+@st.cache_resource
 def configure_api(model_name):
     """
     Loads the API key from Streamlit's secrets and configures the Gemini client.
+    The model handle is cached, so reruns reuse the same GenerativeModel.
+    Errors are raised rather than returned: st.cache_resource doesn't cache
+    exceptions, so a secret added later is picked up on the next call.
     """
     # Read the API key from Streamlit's secrets
     try:
         GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
     except KeyError:
-        st.error("Error: GEMINI_API_KEY not found. Please add it to your Streamlit secrets.")
-        return None
+        raise RuntimeError("GEMINI_API_KEY not found. Please add it to your Streamlit secrets.") from None
 
     # Configure the Gemini API
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(model_name)
+
+@st.cache_resource
+def get_transcript_cache():
+    """
+    Opens the on-disk transcript cache, which survives app restarts (st.cache_data
+    is in-memory only). Cached so reruns don't reopen the SQLite database.
+    """
+    return Cache("./.transcript_cache")
+
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 60 * 60  # one week, in seconds
+
+@st.cache_resource
+def get_summary_cache():
+    """
+    Opens the on-disk cache of finished summaries, keyed on
+    (video_id, summary_format, model_name). Cached so reruns don't reopen it.
+    """
+    return Cache("./.summary_cache")
+
+SUMMARY_CACHE_TTL = 7 * 24 * 60 * 60  # one week, in seconds
+
+@st.cache_resource
+def get_transcript_api_pool():
+    """
+    Holds idle YouTubeTranscriptApi clients, each with its own pooled HTTP session.
+    Cached because Streamlit runs every rerun on a fresh thread, so neither a
+    module-level client nor a thread-local one would outlive a click.
+    """
+    return queue.SimpleQueue()
+
+@contextmanager
+def transcript_api():
+    """
+    Checks a client out of the pool for one fetch, creating one if none is idle.
+    The class isn't thread-safe, so a client is never shared by concurrent sessions.
+    """
+    pool = get_transcript_api_pool()
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        return genai.GenerativeModel(model_name)
-    except Exception as e:
-        st.error(f"Error during API configuration: {e}")
-        return None
+        api = pool.get_nowait()
+    except queue.Empty:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        api = YouTubeTranscriptApi(http_client=session)
+    try:
+        yield api
+    finally:
+        pool.put(api)
+
+# YouTube throttles bursts of requests; the library raises RequestBlocked (IpBlocked)
+# for HTTP 429 and YouTubeRequestFailed for other HTTP errors, so back off on both
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=1, max=10),
+    retry=retry_if_exception_type((RequestBlocked, YouTubeRequestFailed)),
+    reraise=True,
+)
+def _fetch_with_retry(api_instance, video_id):
+    """Fetches a transcript, retrying failed YouTube requests with jittered backoff."""
+    return api_instance.fetch(video_id)
 
-def get_video_id(url_or_id):
-    """Extracts the YouTube video ID from a URL or returns the ID if already provided."""
-    regex = r"(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})"
-    match = re.search(regex, url_or_id)
-    if match:
-        return match.group(1)
-    elif len(url_or_id) == 11:
-        return url_or_id
-    else:
-        raise ValueError(f"Could not extract video ID from: {url_or_id}")
 @st.cache_data
 def fetch_transcript(youtube_url_or_id):
     """
@@ -50,9 +114,13 @@ def fetch_transcript(youtube_url_or_id):
     video_id = None
     try:
         video_id = get_video_id(youtube_url_or_id)
-        api_instance = YouTubeTranscriptApi()
-        fetched_transcript = api_instance.fetch(video_id)
-        full_transcript = " ".join([snippet.text for snippet in fetched_transcript.snippets])
+        cached_transcript = get_transcript_cache().get(video_id)
+        if cached_transcript is not None:
+            return cached_transcript, video_id
+        with transcript_api() as api:
+            fetched_transcript = _fetch_with_retry(api, video_id)
+        full_transcript = " ".join(snippet.text for snippet in fetched_transcript.snippets)
+        get_transcript_cache().set(video_id, full_transcript, expire=TRANSCRIPT_CACHE_TTL)
         return full_transcript, video_id
     except TranscriptsDisabled:
         st.error(f"Error: Transcripts are disabled for video {video_id}.")
@@ -64,71 +132,230 @@ def fetch_transcript(youtube_url_or_id):
         st.error(f"An unexpected error occurred while fetching transcript: {e}")
         return None, None
 
-def chunk_text(text, chunk_size=8000, overlap=400):
-    if text is None or not text.strip(): return []
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        start += chunk_size - overlap
-        if start + overlap >= len(text): break
-    if start < len(text): chunks.append(text[start:])
-    return chunks
 @st.cache_data
-def summarize_chunk(chunk, model_name, attempt=1, max_attempts=3):
-    """Summarizes a single text chunk using the specified Gemini model."""
-    prompt = f"Please provide a concise summary... {chunk} ---" # (Shortened prompt for clarity)
+def chunk_text_by_tokens(text, model_name, max_tokens=30_000, overlap=0):
+    """
+    Splits a long text into chunks of roughly max_tokens Gemini tokens.
+    The text is tokenized once and chunk sizes come from its characters-per-token ratio.
+    """
+    if text is None or not text.strip(): return []
+    # A token covers at least about one character, so this fits without counting
+    if len(text) <= max_tokens: return [text]
     try:
-        # Create the model inside the cached function
         model = configure_api(model_name)
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        if attempt < max_attempts:
-            time.sleep(2**attempt)
-            return summarize_chunk(chunk, model, attempt + 1, max_attempts)
-        else:
-            st.error(f"Error summarizing chunk: {e}")
-            return None
-@st.cache_data
-def create_final_summary(summaries, model_name, summary_format, video_title="this video"):
-    """Combines all chunk summaries into a final, formatted report."""
-    
-    combined_summaries = "\n\n".join(summaries)
-    
+        chars_per_token = len(text) / max(model.count_tokens(text).total_tokens, 1)
+    except Exception:
+        chars_per_token = 4  # Rough average for English text
+    return chunk_text(text, int(max_tokens * chars_per_token), int(overlap * chars_per_token))
+@st.cache_resource
+def get_event_loop():
+    """
+    Starts one background event loop shared by all async Gemini calls.
+    The cached model's async client stays bound to the loop it was first
+    used on, so a fresh asyncio.run() per click would break it.
+    """
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+# Rate limits and transient server errors are worth retrying; anything else fails fast
+_RETRYABLE_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# Random exponential backoff keeps concurrent requests from retrying in lockstep
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception_type(_RETRYABLE_GEMINI_ERRORS),
+    reraise=True,
+)
+async def _call_model_async(model, prompt, semaphore):
+    """Sends one prompt to Gemini asynchronously, holding the semaphore only while in flight."""
+    async with semaphore:
+        return await model.generate_content_async(prompt)
+
+# Recovers the i-th summary from a batched response
+_BATCH_SUMMARY_RE = re.compile(r"<<<SUMMARY (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+def _context_tails(chunks, batch, context_chars):
+    """
+    For each chunk index in batch, returns the tail of the chunk before it,
+    or "" when that chunk is already in the batch (or there is none).
+    """
+    return [
+        chunks[i - 1][-context_chars:] if i and (k == 0 or batch[k - 1] != i - 1) else ""
+        for k, i in enumerate(batch)
+    ]
+
+async def asummarize_batch(batch, model, semaphore, context_tails=None):
+    """
+    Summarizes a batch of text chunks with a single Gemini request.
+    Returns one summary per chunk; chunks missing from the response come back as None.
+    context_tails[i] is the end of the text just before chunk i, sent as context only.
+    """
+    context_tails = context_tails or [""] * len(batch)
+    chunks_block = "\n".join(
+        (f"<<<CONTEXT {i}>>>{tail}<<<ENDCONTEXT {i}>>>\n" if tail else "")
+        + f"<<<CHUNK {i}>>>{chunk}<<<ENDCHUNK {i}>>>"
+        for i, (chunk, tail) in enumerate(zip(batch, context_tails))
+    )
     prompt = f"""
+    Please provide a concise summary of each of the following video transcript chunks, separately.
+    For every chunk i, output exactly: <<<SUMMARY i>>>[concise summary of chunk i]<<<END i>>>
+    A <<<CONTEXT i>>> block is the end of the text just before chunk i, summarized separately; use it only as context and do not summarize it.
+    {chunks_block}
+    """
+    # Errors are raised to the caller: st.error() doesn't work off the script thread
+    response = await _call_model_async(model, prompt, semaphore)
+    summaries = {int(i): summary.strip() for i, summary in _BATCH_SUMMARY_RE.findall(response.text)}
+    return [summaries.get(i) for i in range(len(batch))]
+
+async def summarize_all_chunks(chunks, model, batch_size=4, max_concurrency=8, context_chars=400):
+    """
+    Summarizes all chunks, batch_size per request, with the requests running concurrently.
+    Chunks summarized on an earlier run are reused. Returns the summaries in chunk
+    order (None for failed chunks) and the errors of any failed requests.
+    """
+    summaries = [get_cached_chunk_summary(model.model_name, chunk) for chunk in chunks]
+    pending = [i for i, summary in enumerate(summaries) if summary is None]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    # Cached chunks leave gaps in pending, so any chunk whose predecessor isn't
+    # in its batch gets that predecessor's tail as context
+    tails = [_context_tails(chunks, batch, context_chars) for batch in batches]
+    results = await asyncio.gather(*[asummarize_batch([chunks[i] for i in batch], model, semaphore, tail) for batch, tail in zip(batches, tails)], return_exceptions=True)
+    errors = []
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            continue
+        for i, summary in zip(batch, result):
+            summaries[i] = summary
+            if summary:
+                cache_chunk_summary(model.model_name, chunks[i], summary)
+    return summaries, errors
+def summarize_chunks(chunks, model_name):
+    """
+    Runs the batched chunk summarization from Streamlit's synchronous script.
+    Returns the summaries in chunk order; failed requests are reported on the page.
+    Not st.cache_data: failed chunks must be retried, and llm_cache already reuses the rest.
+    """
+    model = configure_api(model_name)
+    future = asyncio.run_coroutine_threadsafe(summarize_all_chunks(chunks, model), get_event_loop())
+    summaries, errors = future.result()
+    for error in errors:
+        st.error(f"Error summarizing chunks: {error}")
+    return summaries
+
+# Shared opening of every final-summary prompt
+_FINAL_PROMPT_HEADER = """
     You are an expert video summarizer.
     You will be given a series of summaries from sequential chunks of a video transcript titled '{video_title}'.
+    (For short videos, you will be given the full transcript instead.)
     Please synthesize these chunked summaries into one cohesive, well-formatted final output.
 
-    The user has requested the output in this specific format: **{summary_format}**
-
     ---
     Here are the chunked summaries:
     {combined_summaries}
     ---
+"""
 
-    Please generate the final, synthesized summary now.
-
-    **IMPORTANT FORMATTING RULES:**
-    - If the user requested "Standard Summary", you MUST provide:
+# One prompt per summary format, so each request only carries its own formatting rules
+_PROMPTS = {
+    "Standard Summary": _FINAL_PROMPT_HEADER + """
+    Please generate the final summary now. You MUST provide:
       **Overview:** [A short, engaging overview...]
       **Key Takeaways:** [5-7 bullet points...]
       **Suggested Chapters:** [3-5 chapter titles...]
-    - If the user requested "Bullet-Point Takeaways", provide *only* a list of 10-15 detailed bullet points.
-    - If the user requested "Tweet Thread (3 Tweets)", provide exactly 3 numbered tweets (1/3, 2/3, 3/3) that are concise and engaging.
-    - If the user requested "Blog Post", provide a short, 3-paragraph blog post based on the content.
+    """,
+    "Bullet-Point Takeaways": _FINAL_PROMPT_HEADER + """
+    Please generate the final summary now as *only* a list of 10-15 detailed bullet points.
+    """,
+    "Tweet Thread (3 Tweets)": _FINAL_PROMPT_HEADER + """
+    Please generate the final summary now as exactly 3 numbered tweets (1/3, 2/3, 3/3) that are concise and engaging.
+    """,
+    "Blog Post": _FINAL_PROMPT_HEADER + """
+    Please generate the final summary now as a short, 3-paragraph blog post based on the content.
+    """,
+}
+
+def create_final_summary(summaries, model_name, summary_format, video_title="this video"):
     """
-    
+    Combines all chunk summaries into a final, formatted report.
+    The report is streamed onto the page as it is generated; the full text is returned at the end.
+    """
+    combined_summaries = "\n\n".join(summaries)
+    prompt = _PROMPTS[summary_format].format(video_title=video_title, combined_summaries=combined_summaries)
+
+    placeholder = st.empty()
     try:
-        # This is the new, clean way:
         model = configure_api(model_name)
-        response = model.generate_content(prompt)
-        return response.text
+        response = model.generate_content(prompt, stream=True)
+        final_summary = ""
+        for chunk in response:
+            final_summary += chunk.text
+            placeholder.markdown(final_summary)
+        return final_summary
     except Exception as e:
         st.error(f"Error creating final summary: {e}")
         return None
+    finally:
+        # The display block below renders the finished summary
+        placeholder.empty()
+
+QA_INSTRUCTIONS = """
+Using ONLY the video transcript you were given, please answer the user's question.
+If the answer is not in the transcript, say "I'm sorry, that information is not in the video transcript."
+"""
+
+def answer_question(question, model_name):
+    """
+    Answers a follow-up question using only the current video's transcript.
+    The transcript is uploaded once to Gemini's context cache, so later
+    questions only send the question itself.
+    """
+    # Also configures genai, which a summary served from the summary cache never did
+    model = configure_api(model_name)
+    cache_key = (st.session_state["video_id"], model_name)
+    if st.session_state.get("transcript_cache_key") != cache_key:
+        st.session_state["transcript_cache"] = None
+        try:
+            st.session_state["transcript_cache"] = genai.caching.CachedContent.create(
+                model=model_name,
+                system_instruction=QA_INSTRUCTIONS,
+                contents=[st.session_state["full_transcript"]],
+                ttl=datetime.timedelta(hours=1),
+            )
+            st.session_state["transcript_cache_key"] = cache_key
+        except google_exceptions.InvalidArgument:
+            # e.g. the transcript is shorter than the model's minimum cacheable size
+            st.session_state["transcript_cache_key"] = cache_key
+        except google_exceptions.GoogleAPIError as e:
+            # Possibly transient, so the next question tries caching again
+            st.warning(f"Could not cache the transcript; sending it with the question instead. ({e})")
+
+    if st.session_state["transcript_cache"] is not None:
+        try:
+            cached_model = genai.GenerativeModel.from_cached_content(st.session_state["transcript_cache"])
+            return cached_model.generate_content(question).text
+        except google_exceptions.GoogleAPIError:
+            # The cache may have expired; fall back to sending the transcript
+            st.session_state.pop("transcript_cache_key", None)
+
+    prompt = f"""
+    Here is the full transcript of a video:
+    ---
+    {st.session_state["full_transcript"]}
+    ---
+    {QA_INSTRUCTIONS}
+    Question: {question}
+    """
+    return model.generate_content(prompt).text
 
 # (We are REMOVING the save_summary_to_file function,
 # as we will just display the text on the web page.)
@@ -169,6 +396,8 @@ if st.button("Generate Summary"):
         st.session_state.pop("final_summary", None)
         st.session_state.pop("full_transcript", None)
         st.session_state.pop("video_id", None)
+        st.session_state.pop("last_question", None)
+        st.session_state.pop("last_answer", None)
         
         with st.spinner("Generating summary... This may take a moment."):
             try:
@@ -177,29 +406,42 @@ if st.button("Generate Summary"):
                 
                 if transcript:
                     st.session_state["full_transcript"] = transcript # Save transcript
-                    
-                    # 2. Chunk Text
-                    text_chunks = chunk_text(transcript)
-                    
-                    # 3. Summarize Chunks
-                    chunk_summaries = []
-                    for i, chunk in enumerate(text_chunks):
-                        summary = summarize_chunk(chunk, MODEL_CHOICE)
-                        if summary:
-                            chunk_summaries.append(summary)
-                    
-                    # 4. Combine Summaries
-                    if chunk_summaries:
-                        final_summary = create_final_summary(chunk_summaries, MODEL_CHOICE, summary_format, video_title=video_id)
-                        
-                        if final_summary:
-                            # 5. Save results to session state
-                            st.session_state["final_summary"] = final_summary
-                            st.session_state["video_id"] = video_id
+
+                    # Re-runs with the same video, format and model skip steps 2-4
+                    summary_key = (video_id, summary_format, MODEL_CHOICE)
+                    final_summary = get_summary_cache().get(summary_key)
+
+                    if final_summary is None:
+                        # 2. Chunk Text
+                        text_chunks = chunk_text_by_tokens(transcript, MODEL_CHOICE)
+
+                        # 3. Summarize Chunks
+                        # A single chunk goes straight into the final summary, saving a round-trip
+                        if len(text_chunks) == 1:
+                            chunk_summaries = text_chunks
                         else:
-                            st.error("Could not generate the final summary.")
-                    else:
-                        st.error("No chunk summaries were generated.")
+                            chunk_summaries = [summary for summary in summarize_chunks(text_chunks, MODEL_CHOICE) if summary]
+                        # A summary missing some chunks is still shown, but not kept for later clicks
+                        all_chunks_summarized = len(chunk_summaries) == len(text_chunks)
+
+                        # 4. Combine Summaries
+                        if chunk_summaries:
+                            final_summary = create_final_summary(chunk_summaries, MODEL_CHOICE, summary_format, video_title=video_id)
+
+                            if final_summary:
+                                if all_chunks_summarized:
+                                    get_summary_cache().set(summary_key, final_summary, expire=SUMMARY_CACHE_TTL)
+                                else:
+                                    st.warning("Some chunks could not be summarized, so this summary is incomplete. Click again to retry them.")
+                            else:
+                                st.error("Could not generate the final summary.")
+                        else:
+                            st.error("No chunk summaries were generated.")
+
+                    if final_summary:
+                        # 5. Save results to session state
+                        st.session_state["final_summary"] = final_summary
+                        st.session_state["video_id"] = video_id
             except Exception as e:
                 st.error(f"An unexpected error occurred: {e}")
 
@@ -225,17 +467,14 @@ if "final_summary" in st.session_state:
         User_question = st.text_input("Ask a follow-up question about this video:")
         
         if User_question:
-            with st.spinner("Finding the answer..."):
-                prompt = f"""
-                Here is the full transcript of a video:
-                ---
-                {st.session_state["full_transcript"]}
-                ---
-                Using ONLY this transcript, please answer the following question:
-                {User_question}
-                If the answer is not in the transcript, say "I'm sorry, that information is not in the video transcript."
-                """
-                
-                model = configure_api(MODEL_CHOICE) # We can use MODEL_CHOICE from the top
-                response = model.generate_content(prompt)
-                st.markdown(response.text)
\ No newline at end of file
+            # Reruns from other widgets reuse the last answer instead of asking again
+            if st.session_state.get("last_question") != (User_question, MODEL_CHOICE):
+                st.session_state.pop("last_answer", None)
+                with st.spinner("Finding the answer..."):
+                    try:
+                        st.session_state["last_answer"] = answer_question(User_question, MODEL_CHOICE) # We can use MODEL_CHOICE from the top
+                        st.session_state["last_question"] = (User_question, MODEL_CHOICE)
+                    except Exception as e:
+                        st.error(f"Error answering question: {e}")
+            if "last_answer" in st.session_state:
+                st.markdown(st.session_state["last_answer"])
@@ -0,0 +1,32 @@
+# --------------------------------------------------
+# Persistent cache for Gemini responses (used by app.py and main.py)
+# --------------------------------------------------
+import hashlib
+from diskcache import Cache
+
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # one week, in seconds
+
+# Survives restarts, so re-running the same prompt skips the API call
+_LLM_CACHE = Cache("./.llm_cache")
+
+def _cache_key(model_name, prompt):
+    """Builds the exact-match cache key for a model and prompt."""
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+def get_cached_response(model_name, prompt):
+    """Returns the cached result for this model and prompt, or None on a miss."""
+    return _LLM_CACHE.get(_cache_key(model_name, prompt))
+
+def cache_response(model_name, prompt, result):
+    """Stores the result for this model and prompt."""
+    _LLM_CACHE.set(_cache_key(model_name, prompt), result, expire=LLM_CACHE_TTL)
+
+# Chunk summaries are stored per chunk rather than per prompt, so they can be
+# reused whatever batch, context or final-summary prompt they end up in
+def get_cached_chunk_summary(model_name, chunk):
+    """Returns the stored summary of this transcript chunk, or None on a miss."""
+    return _LLM_CACHE.get(("chunk", _cache_key(model_name, chunk)))
+
+def cache_chunk_summary(model_name, chunk, summary):
+    """Stores the summary of this transcript chunk."""
+    _LLM_CACHE.set(("chunk", _cache_key(model_name, chunk)), summary, expire=LLM_CACHE_TTL)
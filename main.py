@@ -3,21 +3,53 @@
 # --------------------------------------------------
 import google.generativeai as genai
 # This is the corrected import, as per our last discussion
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, YouTubeRequestFailed, RequestBlocked
+from google.api_core import exceptions as google_exceptions
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 import re
-import json
-import time
+import asyncio
+import threading
+from functools import cache
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
+from diskcache import Cache
+# uvloop is optional (not available on Windows); it gives asyncio a faster event loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+# orjson is faster, but the stdlib json module works as a fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+from transcript_utils import get_video_id, chunk_text
+from llm_cache import get_cached_response, cache_response, get_cached_chunk_summary, cache_chunk_summary
+
+@cache
+def load_api_key():
+    """
+    Loads the .env file once and returns GEMINI_API_KEY (None if missing).
+    Later calls reuse the result instead of re-reading .env from disk.
+    """
+    load_dotenv()
+    return os.getenv("GEMINI_API_KEY")
+
+@cache
+def _configure_genai(api_key):
+    """Configures the Gemini client once per API key."""
+    genai.configure(api_key=api_key)
 
 def configure_api(model_name):
     """
     Loads the API key from .env and configures the Gemini client.
     """
-    # Load environment variables from .env file
-    load_dotenv() 
-    
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    GEMINI_API_KEY = load_api_key()
     
     if not GEMINI_API_KEY:
         print("Error: GEMINI_API_KEY not found in .env file.")
@@ -25,7 +57,7 @@ def configure_api(model_name):
         return None
 
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
+        _configure_genai(GEMINI_API_KEY)
         print("Gemini API configured successfully.")
         return genai.GenerativeModel(model_name) # Or your model
     except Exception as e:
@@ -33,18 +65,36 @@ def configure_api(model_name):
         return None
 
 # --------------------------------------------------
-# Cell 3: Function to Fetch Transcript (CORRECTED)
+# Cell 3: Functions to Fetch Transcripts (CORRECTED)
 # --------------------------------------------------
-def get_video_id(url_or_id):
-    """Extracts the YouTube video ID from a URL or returns the ID if already provided."""
-    regex = r"(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})"
-    match = re.search(regex, url_or_id)
-    if match:
-        return match.group(1)
-    elif len(url_or_id) == 11:
-        return url_or_id
-    else:
-        raise ValueError(f"Could not extract video ID from: {url_or_id}")
+# On-disk transcript cache, so re-running on the same video skips the YouTube fetch
+_TRANSCRIPT_CACHE = Cache("./.transcript_cache")
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 60 * 60  # one week, in seconds
+
+# YouTubeTranscriptApi isn't thread-safe, so each worker thread keeps its own
+# client and pooled HTTP session, reusing TLS connections across its fetches
+_YT_LOCAL = threading.local()
+
+def get_transcript_api():
+    """Returns this thread's YouTubeTranscriptApi, creating it on first use."""
+    api = getattr(_YT_LOCAL, "api", None)
+    if api is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        api = _YT_LOCAL.api = YouTubeTranscriptApi(http_client=session)
+    return api
+
+# YouTube throttles bursts of requests; the library raises RequestBlocked (IpBlocked)
+# for HTTP 429 and YouTubeRequestFailed for other HTTP errors, so back off on both
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=1, max=10),
+    retry=retry_if_exception_type((RequestBlocked, YouTubeRequestFailed)),
+    reraise=True,
+)
+def _fetch_with_retry(api_instance, video_id):
+    """Fetches a transcript, retrying failed YouTube requests with jittered backoff."""
+    return api_instance.fetch(video_id)
 
 def fetch_transcript(youtube_url_or_id):
     """
@@ -55,20 +105,23 @@ def fetch_transcript(youtube_url_or_id):
     try:
         video_id = get_video_id(youtube_url_or_id)
         print(f"Extracted Video ID: {video_id}")
+
+        cached_transcript = _TRANSCRIPT_CACHE.get(video_id)
+        if cached_transcript is not None:
+            print("Using cached transcript.")
+            return cached_transcript, video_id
         
         # --- THIS IS THE CORRECTED CODE ---
         
-        # 1. Create an instance of the class
-        api_instance = YouTubeTranscriptApi()
+        # 1. Call .fetch() on this thread's instance to get the FetchedTranscript object
+        fetched_transcript = _fetch_with_retry(get_transcript_api(), video_id)
         
-        # 2. Call .fetch() to get the FetchedTranscript object
-        fetched_transcript = api_instance.fetch(video_id)
-        
-        # 3. Process the new object structure
+        # 2. Process the new object structure
         # The object contains a .snippets list, and each snippet has a .text attribute
-        full_transcript = " ".join([snippet.text for snippet in fetched_transcript.snippets])
+        full_transcript = " ".join(snippet.text for snippet in fetched_transcript.snippets)
         # --- END FIX ---
-        
+
+        _TRANSCRIPT_CACHE.set(video_id, full_transcript, expire=TRANSCRIPT_CACHE_TTL)
         return full_transcript, video_id
         
     except TranscriptsDisabled:
@@ -81,59 +134,150 @@ def fetch_transcript(youtube_url_or_id):
         print(f"An unexpected error occurred: {e}")
         return None, None
 
+async def fetch_transcript_async(youtube_url_or_id, semaphore):
+    """Runs fetch_transcript in a worker thread, bounded by the semaphore."""
+    async with semaphore:
+        return await asyncio.to_thread(fetch_transcript, youtube_url_or_id)
+
+async def fetch_transcripts(youtube_urls, max_concurrency=4):
+    """
+    Fetches the transcripts of several videos concurrently.
+    Concurrency stays low because YouTube throttles aggressively.
+    Returns one (transcript, video_id) pair per URL, in order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(*[fetch_transcript_async(url, semaphore) for url in youtube_urls], return_exceptions=True)
+    # One failed video shouldn't fail the whole batch
+    return [(None, None) if isinstance(result, Exception) else result for result in results]
+
 # --------------------------------------------------
-# Cell 4: Function to Chunk Text
+# Cell 4: Functions to Chunk Text
 # --------------------------------------------------
-def chunk_text(text, chunk_size=8000, overlap=400):
-    """Splits a long text into smaller, overlapping chunks."""
+def chunk_text_by_tokens(text, model, max_tokens=30_000, overlap=0):
+    """
+    Splits a long text into chunks of roughly max_tokens Gemini tokens.
+    The text is tokenized once with model.count_tokens, and the chunk size in
+    characters is derived from its characters-per-token ratio.
+    """
     if text is None or not text.strip():
         print("Cannot chunk empty or None text.")
         return []
-        
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        start += chunk_size - overlap
-        if start + overlap >= len(text):
-            break
-    if start < len(text):
-        chunks.append(text[start:])
-    return chunks
+
+    # A Gemini token covers at least about one character, so text this short is a
+    # single chunk (and one final-summary call) without a count_tokens round-trip
+    if len(text) <= max_tokens:
+        return [text]
+
+    try:
+        chars_per_token = len(text) / max(model.count_tokens(text).total_tokens, 1)
+    except Exception as e:
+        print(f"Could not count tokens, assuming ~4 characters per token: {e}")
+        chars_per_token = 4
+    return chunk_text(text, int(max_tokens * chars_per_token), int(overlap * chars_per_token))
 
 # --------------------------------------------------
-# Cell 5: Function to Summarize Each Chunk
+# Cell 5: Functions to Summarize the Chunks (Concurrently)
 # --------------------------------------------------
-def summarize_chunk(chunk, model, attempt=1, max_attempts=3):
-    """Summarizes a single text chunk using the specified Gemini model."""
+# Rate limits and transient server errors are worth retrying; anything else fails fast
+_RETRYABLE_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# Random exponential backoff keeps concurrent requests from retrying in lockstep
+_gemini_retry = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception_type(_RETRYABLE_GEMINI_ERRORS),
+    before_sleep=lambda state: print(f"Gemini request failed (Attempt {state.attempt_number}/5), retrying: {state.outcome.exception()}"),
+    reraise=True,
+)
+
+@_gemini_retry
+def _call_model(model, prompt, stream=False):
+    """Sends one prompt to Gemini and returns the response (an iterator of parts if stream=True)."""
+    return model.generate_content(prompt, stream=stream)
+
+@_gemini_retry
+async def _call_model_async(model, prompt, semaphore):
+    """Sends one prompt to Gemini asynchronously, holding the semaphore only while in flight."""
+    async with semaphore:
+        return await model.generate_content_async(prompt)
+
+# Recovers the i-th summary from a batched response
+_BATCH_SUMMARY_RE = re.compile(r"<<<SUMMARY (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+def _context_tails(chunks, batch, context_chars):
+    """
+    For each chunk index in batch, returns the tail of the chunk before it,
+    or "" when that chunk is already in the batch (or there is none).
+    """
+    return [
+        chunks[i - 1][-context_chars:] if i and (k == 0 or batch[k - 1] != i - 1) else ""
+        for k, i in enumerate(batch)
+    ]
+
+async def asummarize_batch(batch, model, semaphore, context_tails=None):
+    """
+    Summarizes a batch of text chunks with a single Gemini request.
+    Returns one summary per chunk; chunks missing from the response come back as None.
+    context_tails[i] is the end of the text just before chunk i, sent as context only.
+    """
+    context_tails = context_tails or [""] * len(batch)
+    chunks_block = "\n".join(
+        (f"<<<CONTEXT {i}>>>{tail}<<<ENDCONTEXT {i}>>>\n" if tail else "")
+        + f"<<<CHUNK {i}>>>{chunk}<<<ENDCHUNK {i}>>>"
+        for i, (chunk, tail) in enumerate(zip(batch, context_tails))
+    )
     prompt = f"""
-    Please provide a concise summary of the following video transcript chunk.
+    Please provide a concise summary of each of the following video transcript chunks, separately.
     Focus on the main topics, key arguments, and any conclusions.
-    Transcript Chunk: --- {chunk} ---
-    Concise Summary:
+    For every chunk i, output exactly: <<<SUMMARY i>>>[concise summary of chunk i]<<<END i>>>
+    A <<<CONTEXT i>>> block is the end of the text just before chunk i, summarized separately; use it only to follow the flow and do not summarize it.
+    Transcript Chunks:
+    {chunks_block}
+    Concise Summaries:
     """
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        response = await _call_model_async(model, prompt, semaphore)
+        summaries = {int(i): summary.strip() for i, summary in _BATCH_SUMMARY_RE.findall(response.text)}
+        return [summaries.get(i) for i in range(len(batch))]
     except Exception as e:
-        print(f"Error summarizing chunk (Attempt {attempt}/{max_attempts}): {e}")
-        if attempt < max_attempts:
-            time.sleep(2**attempt)
-            return summarize_chunk(chunk, model, attempt + 1, max_attempts)
-        else:
-            print(f"Failed to summarize chunk after {max_attempts} attempts.")
-            return None
+        print(f"Failed to summarize batch: {e}")
+        return [None] * len(batch)
+
+async def summarize_all_chunks(chunks, model, batch_size=4, max_concurrency=8, context_chars=400):
+    """
+    Summarizes all chunks, batch_size chunks per request, with the requests
+    running concurrently. Chunks summarized on an earlier run are reused.
+    Returns the summaries in chunk order; failed chunks come back as None.
+    """
+    summaries = [get_cached_chunk_summary(model.model_name, chunk) for chunk in chunks]
+    pending = [i for i, summary in enumerate(summaries) if summary is None]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    # Cached chunks leave gaps in pending, so any chunk whose predecessor isn't
+    # in its batch gets that predecessor's tail as context
+    tails = [_context_tails(chunks, batch, context_chars) for batch in batches]
+    results = await asyncio.gather(*[asummarize_batch([chunks[i] for i in batch], model, semaphore, tail) for batch, tail in zip(batches, tails)])
+    for batch, batch_summaries in zip(batches, results):
+        for i, summary in zip(batch, batch_summaries):
+            summaries[i] = summary
+            if summary:
+                cache_chunk_summary(model.model_name, chunks[i], summary)
+    return summaries
 
 # --------------------------------------------------
 # Cell 6: Function to Combine Summaries
 # --------------------------------------------------
-def create_final_summary(summaries, model, video_title="this video"):
-    """Combines all chunk summaries into a final, formatted report."""
-    combined_summaries = "\n\n".join(summaries)
-    prompt = f"""
+# Built once at import; only the title and summaries change per call
+_FINAL_PROMPT_TEMPLATE = """
     You are an expert video summarizer.
     You will be given a series of summaries from sequential chunks of a video transcript titled '{video_title}'.
+    (For short videos, you will be given the full transcript instead.)
     Please synthesize these chunked summaries into one cohesive, well-formatted final output.
 
     The output MUST be in the following Markdown format:
@@ -159,10 +303,32 @@ def create_final_summary(summaries, model, video_title="this video"):
     ---
 
     Please generate the final, synthesized summary now.
+"""
+
+def create_final_summary(summaries, model, video_title="this video", stream_to=None):
     """
+    Combines all chunk summaries into a final, formatted report.
+    If stream_to is given (e.g. sys.stdout), the text is written to it as it arrives.
+    """
+    combined_summaries = "\n\n".join(summaries)
+    prompt = _FINAL_PROMPT_TEMPLATE.format(video_title=video_title, combined_summaries=combined_summaries)
+    cached_summary = get_cached_response(model.model_name, prompt)
+    if cached_summary is not None:
+        if stream_to is not None:
+            stream_to.write(cached_summary)
+        return cached_summary
+
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        response = _call_model(model, prompt, stream=True)
+        parts = []
+        for chunk in response:
+            parts.append(chunk.text)
+            if stream_to is not None:
+                stream_to.write(chunk.text)
+                stream_to.flush()
+        final_summary = "".join(parts)
+        cache_response(model.model_name, prompt, final_summary)
+        return final_summary
     except Exception as e:
         print(f"Error creating final summary: {e}")
         return None
@@ -170,30 +336,36 @@ def create_final_summary(summaries, model, video_title="this video"):
 # --------------------------------------------------
 # Cell 8 (Modified): Save Summary Locally
 # --------------------------------------------------
-def save_summary_to_file(summary_text, video_id, source_url, model_name):
+def _dump_json(data):
+    """Serializes data to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+async def save_summary_to_file(summary_text, video_id, source_url, model_name):
     """Saves the final summary to a .txt and .json file locally."""
     if not summary_text:
         print("No summary text to save.")
         return
 
+    txt_path = Path(f"summary_{video_id}.txt")
+    json_path = Path(f"summary_{video_id}.json")
+    # Serialize up front so the writes below are pure disk time
+    json_payload = _dump_json({
+        "source_url": source_url,
+        "video_id": video_id,
+        "model_used": model_name,
+        "summary_markdown": summary_text
+    })
+
     try:
-        # Save as .txt
-        txt_file_name = f"summary_{video_id}.txt"
-        with open(txt_file_name, "w", encoding="utf-8") as f:
-            f.write(summary_text)
-        print(f"✅ Summary saved to: {txt_file_name}")
-
-        # Save as .json
-        json_file_name = f"summary_{video_id}.json"
-        json_output = {
-            "source_url": source_url,
-            "video_id": video_id,
-            "model_used": model_name,
-            "summary_markdown": summary_text
-        }
-        with open(json_file_name, "w", encoding="utf-8") as jf:
-            json.dump(json_output, jf, indent=2)
-        print(f"✅ JSON version saved to: {json_file_name}")
+        # Write both files at once; helps most on network-mounted directories
+        await asyncio.gather(
+            asyncio.to_thread(txt_path.write_text, summary_text, encoding="utf-8"),
+            asyncio.to_thread(json_path.write_bytes, json_payload),
+        )
+        print(f"✅ Summary saved to: {txt_path}")
+        print(f"✅ JSON version saved to: {json_path}")
 
     except Exception as e:
         print(f"❌ Error saving summary to file: {e}")
@@ -201,15 +373,77 @@ def save_summary_to_file(summary_text, video_id, source_url, model_name):
 # --------------------------------------------------
 # Cell 7: Main Pipeline
 # --------------------------------------------------
+async def summarize_video(youtube_url, transcript, video_id, model, model_name):
+    """
+    Runs steps 2-5 of the pipeline for one video whose transcript was already fetched.
+    """
+    print(f"✅ Transcript fetched! (Length: {len(transcript)} characters)")
+
+    # 2. Chunk Text
+    print(f"\n[Step 2/5] Chunking text...")
+    text_chunks = chunk_text_by_tokens(transcript, model)
+    print(f"✅ Text divided into {len(text_chunks)} chunks.")
+
+    # 3. Summarize Chunks
+    chunk_summaries = []
+    if len(text_chunks) == 1:
+        # A single chunk goes straight into the final summary, saving a round-trip
+        print(f"\n[Step 3/5] Only one chunk, skipping chunk summaries.")
+        chunk_summaries = text_chunks
+    else:
+        print(f"\n[Step 3/5] Summarizing {len(text_chunks)} chunks...")
+        results = await summarize_all_chunks(text_chunks, model)
+        for i, summary in enumerate(results):
+            if summary:
+                chunk_summaries.append(summary)
+            else:
+                print(f"  ❌ Failed to summarize chunk {i+1}.")
+
+    # 4. Combine Summaries
+    if chunk_summaries:
+        print(f"\n[Step 4/5] Combining summaries into final report...")
+        # The summary is printed as it is generated
+        print(f"\n🎉 --- FINAL SUMMARY --- 🎉")
+        final_summary = create_final_summary(chunk_summaries, model, video_title=video_id, stream_to=sys.stdout)
+
+        # 5. Save Final Summary
+        if final_summary:
+            print(f"\n\n[Step 5/5] Saving summary files...")
+            await save_summary_to_file(final_summary, video_id, youtube_url, model_name)
+        else:
+            print("\n❌ Error: Could not generate final summary.")
+    else:
+        print("\n❌ Error: No chunk summaries were generated.")
+
+async def run_pipeline(youtube_urls, model, model_name):
+    """
+    Fetches all transcripts concurrently, then summarizes the videos one by one.
+    Everything runs on one event loop, which the async Gemini client is bound to.
+    """
+    # 1. Fetch Transcripts
+    print(f"\n[Step 1/5] Fetching {len(youtube_urls)} transcript(s)...")
+    transcripts = await fetch_transcripts(youtube_urls)
+
+    for youtube_url, (transcript, video_id) in zip(youtube_urls, transcripts):
+        print(f"\n🚀 Summarizing: {youtube_url}")
+        if transcript:
+            await summarize_video(youtube_url, transcript, video_id, model, model_name)
+        else:
+            print("\n❌ Skipping this video as its transcript could not be fetched.")
+
 def main():
     """
     Main function to run the summarization pipeline.
     """
     # --- User Inputs ---
-    YOUTUBE_URL = input("Please paste the YouTube URL and press Enter: ")
+    YOUTUBE_URLS = input("Please paste one or more YouTube URLs (separated by spaces) and press Enter: ").split()
     MODEL_CHOICE = "gemini-2.5-flash" # or "gemini-1.5-flash-latest"
     # --- End User Inputs ---
 
+    if not YOUTUBE_URLS:
+        print("Please enter at least one YouTube URL.")
+        return
+
     model = configure_api(MODEL_CHOICE)
     if not model:
         return # Stop if API config failed
@@ -218,51 +452,14 @@ def main():
     # model.model_name = MODEL_CHOICE  <-- DELETE THIS LINE
     print(f"Using model: {MODEL_CHOICE}")
 
-    print(f"\n🚀 Starting the YouTube Video Summarizer for: {YOUTUBE_URL}")
-
-    # 1. Fetch Transcript
-    print(f"\n[Step 1/5] Fetching transcript...")
-    transcript, video_id = fetch_transcript(YOUTUBE_URL)
-
-    if transcript:
-        print(f"✅ Transcript fetched! (Length: {len(transcript)} characters)")
-        
-        # 2. Chunk Text
-        print(f"\n[Step 2/5] Chunking text...")
-        text_chunks = chunk_text(transcript)
-        print(f"✅ Text divided into {len(text_chunks)} chunks.")
-        
-        # 3. Summarize Chunks
-        chunk_summaries = []
-        print(f"\n[Step 3/5] Summarizing chunks...")
-        for i, chunk in enumerate(text_chunks):
-            print(f"  Summarizing chunk {i+1}/{len(text_chunks)}...")
-            summary = summarize_chunk(chunk, model)
-            if summary:
-                chunk_summaries.append(summary)
-            else:
-                print(f"  ❌ Failed to summarize chunk {i+1}.")
-                
-        # 4. Combine Summaries
-        if chunk_summaries:
-            print(f"\n[Step 4/5] Combining summaries into final report...")
-            final_summary = create_final_summary(chunk_summaries, model, video_title=video_id)
-            
-            # 5. Display Final Summary
-            if final_summary:
-                print(f"\n[Step 5/5] 🎉 --- FINAL SUMMARY --- 🎉")
-                print(final_summary)
-                
-                # Save the file locally
-                save_summary_to_file(final_summary, video_id, YOUTUBE_URL, MODEL_CHOICE)
-            else:
-                print("\n❌ Error: Could not generate final summary.")
-        else:
-            print("\n❌ Error: No chunk summaries were generated.")
+    print(f"\n🚀 Starting the YouTube Video Summarizer for {len(YOUTUBE_URLS)} video(s)")
+    pipeline = run_pipeline(YOUTUBE_URLS, model, MODEL_CHOICE)
+    if uvloop is not None:
+        uvloop.run(pipeline)
     else:
-        print("\n❌ Stopping pipeline as transcript could not be fetched.")
+        asyncio.run(pipeline)
 
 
 # This makes the script runnable from the command line
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
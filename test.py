@@ -8,14 +8,22 @@ import re
 import json
 import time
 import os
+import hashlib
+from pathlib import Path
 from dotenv import load_dotenv
+from functools import cache, lru_cache
+
+@cache
+def load_api_key():
+    """Loads the .env file once and returns GEMINI_API_KEY (None if missing)."""
+    load_dotenv()
+    return os.getenv("GEMINI_API_KEY")
 
 def configure_api(model_name): # We keep this for later
     """
     Loads the API key from .env and configures the Gemini client.
     """
-    load_dotenv() 
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    GEMINI_API_KEY = load_api_key()
     if not GEMINI_API_KEY:
         print("Error: GEMINI_API_KEY not found in .env file.")
         return None
@@ -116,6 +124,36 @@ def save_summary_to_file(summary_text, video_id, source_url, model_name):
         print(f"✅ JSON version saved to: {json_file_name}")
     except Exception as e: print(f"❌ Error saving summary to file: {e}")
 
+# The model list rarely changes, so it is kept on disk for a day
+MODELS_CACHE_FILE = Path.home() / ".cache" / "youtube-summarizer" / "models.json"
+MODELS_CACHE_TTL = 24 * 60 * 60  # one day, in seconds
+
+@lru_cache(maxsize=1)
+def list_models(api_key):
+    """Returns [{"name", "methods"}] for every model, from disk if fetched recently."""
+    # Stored with a hash of the key, since different keys can see different models
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    try:
+        if time.time() - MODELS_CACHE_FILE.stat().st_mtime < MODELS_CACHE_TTL:
+            cached = json.loads(MODELS_CACHE_FILE.read_text(encoding="utf-8"))
+            if cached.get("api_key_sha256") == key_hash:
+                return cached["models"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass  # Missing or unreadable cache file; fetch a fresh list
+
+    models = [
+        {"name": m.name, "methods": list(m.supported_generation_methods)}
+        for m in genai.list_models()
+    ]
+    try:
+        MODELS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        MODELS_CACHE_FILE.write_text(
+            json.dumps({"api_key_sha256": key_hash, "models": models}), encoding="utf-8"
+        )
+    except OSError as e:
+        print(f"Could not cache model list: {e}")
+    return models
+
 # --------------------------------------------------
 # Cell 7: Main Pipeline (DIAGNOSTIC VERSION)
 # --------------------------------------------------
@@ -126,8 +164,7 @@ def main():
     # --- DIAGNOSTIC STEP ---
     # Load and configure the API key *without* creating a model yet
     print("Configuring API to list models...")
-    load_dotenv() 
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    GEMINI_API_KEY = load_api_key()
     if not GEMINI_API_KEY:
         print("Error: GEMINI_API_KEY not found in .env file.")
         return
@@ -142,9 +179,9 @@ def main():
     print("\n--- Listing Your Available Models ---")
     print("The script will stop after this. Please paste this list in our chat.")
     try:
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                print(f"  * {m.name}")
+        for m in list_models(GEMINI_API_KEY):
+            if 'generateContent' in m["methods"]:
+                print(f"  * {m['name']}")
         print("---------------------------------")
         return # Stop the script
     except Exception as e:
@@ -0,0 +1,91 @@
+"""Tests for the transcript chunking helpers in transcript_utils.py."""
+import random
+
+import pytest
+
+from transcript_utils import _chunk_end, chunk_text
+
+
+def make_transcript(n_words, seed=0):
+    """Builds a deterministic transcript-like text of short sentences."""
+    rng = random.Random(seed)
+    words = ["the", "video", "talks", "about", "python", "caching", "and", "speed", "today", "we"]
+    sentences = []
+    while n_words > 0:
+        length = min(rng.randint(3, 15), n_words)
+        sentence = " ".join(rng.choice(words) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice([".", "?", "!"]))
+        n_words -= length
+    return " ".join(sentences)
+
+
+TEXTS = [
+    make_transcript(2_000, seed=1),
+    make_transcript(5_000, seed=2),
+    "x" * 10_000,  # No sentence or word boundaries at all
+]
+TEXT_IDS = ["short", "long", "no-boundaries"]
+
+
+def test_empty_text_gives_no_chunks():
+    assert chunk_text(None) == []
+    assert chunk_text("   ") == []
+
+
+def test_short_text_is_a_single_chunk():
+    text = make_transcript(50)
+    assert chunk_text(text, chunk_size=len(text)) == [text]
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+@pytest.mark.parametrize("overlap", [0, 100])
+def test_chunks_never_exceed_chunk_size(text, overlap):
+    chunks = chunk_text(text, chunk_size=1_000, overlap=overlap)
+    assert len(chunks) > 1
+    assert all(0 < len(chunk) <= 1_000 for chunk in chunks)
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+def test_non_overlapping_chunks_join_back_to_the_text(text):
+    chunks = chunk_text(text, chunk_size=1_000)
+    assert "".join(chunks) == text
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+def test_overlapping_chunks_share_exactly_the_overlap(text):
+    overlap = 100
+    chunks = chunk_text(text, chunk_size=1_000, overlap=overlap)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.startswith(previous[-overlap:])
+    assert chunks[0] + "".join(chunk[overlap:] for chunk in chunks[1:]) == text
+
+
+@pytest.mark.parametrize("text", TEXTS, ids=TEXT_IDS)
+@pytest.mark.parametrize("overlap", [0, 100])
+def test_tail_chunk_is_not_duplicated(text, overlap):
+    chunks = chunk_text(text, chunk_size=1_000, overlap=overlap)
+    assert text.endswith(chunks[-1])
+    # The last chunk must add text the one before it didn't already cover
+    assert len(chunks[-1]) > overlap
+    # A repeated tail chunk would add characters beyond the expected overlaps
+    assert sum(len(chunk) for chunk in chunks) == len(text) + overlap * (len(chunks) - 1)
+
+
+def test_chunk_end_snaps_to_a_sentence_end():
+    text = "a" * 95 + ". " + "b" * 100
+    assert _chunk_end(text, 0, 100) == 97
+    assert text[:97].endswith(". ")
+
+
+def test_chunk_end_falls_back_to_a_space():
+    text = "a" * 95 + " " + "b" * 100
+    assert _chunk_end(text, 0, 100) == 96
+
+
+def test_chunk_end_ignores_boundaries_outside_the_last_tenth():
+    text = "a" * 50 + ". " + "b" * 200
+    assert _chunk_end(text, 0, 100) == 100
+
+
+def test_chunk_end_stops_at_the_end_of_the_text():
+    assert _chunk_end("short text", 0, 100) == len("short text")
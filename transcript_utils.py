@@ -0,0 +1,89 @@
+# --------------------------------------------------
+# Transcript helpers: video ID parsing and chunking (used by app.py and main.py)
+# --------------------------------------------------
+# A plain module, so app.py's Streamlit reruns keep the compiled regex and the
+# lru_cache instead of rebuilding them on every interaction
+import re
+from functools import lru_cache
+
+# Compiled once at import instead of on every get_video_id() call
+_YT_ID_RE = re.compile(r"(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})", re.ASCII)
+_VIDEO_ID_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-")
+_URL_ID_MARKERS = ("youtu.be/", "?v=", "&v=", "/embed/", "/v/")
+
+def _slice_video_id(url):
+    """
+    Slices the ID out of URLs with a single, unambiguous marker using str.find.
+    Returns None for anything else, leaving the regex to decide.
+    """
+    # Whitespace, repeated hosts or extra path segments can change what the regex picks
+    if not url.isprintable() or " " in url or url.count("youtube.com/") > 1:
+        return None
+    host = url.find("youtube.com/")
+    if host != -1 and url.count("/", host + len("youtube.com/")) > 1:
+        return None
+    hits = [marker for marker in _URL_ID_MARKERS if marker in url]
+    if len(hits) != 1 or url.count(hits[0]) != 1:
+        return None
+    i = url.find(hits[0])
+    # Query and path markers only count after the youtube.com/ host
+    if hits[0] != "youtu.be/" and (host == -1 or i < host + len("youtube.com/") - 1):
+        return None
+    candidate = url[i + len(hits[0]):i + len(hits[0]) + 11]
+    if len(candidate) == 11 and _VIDEO_ID_CHARS.issuperset(candidate):
+        return candidate
+    return None
+
+@lru_cache(maxsize=256)
+def get_video_id(url_or_id):
+    """Extracts the YouTube video ID from a URL or returns the ID if already provided."""
+    # Bare IDs don't need the regex at all
+    if len(url_or_id) == 11 and _VIDEO_ID_CHARS.issuperset(url_or_id):
+        return url_or_id
+    # Common URL shapes are sliced out with str.find; the regex handles the rest
+    if "youtube.com/" in url_or_id or "youtu.be/" in url_or_id:
+        video_id = _slice_video_id(url_or_id)
+        if video_id is not None:
+            return video_id
+    match = _YT_ID_RE.search(url_or_id)
+    if match:
+        return match.group(1)
+    elif len(url_or_id) == 11:
+        return url_or_id
+    else:
+        raise ValueError(f"Could not extract video ID from: {url_or_id}")
+
+def _chunk_end(text, start, chunk_size):
+    """
+    Returns where the chunk starting at `start` should end: just after the last
+    sentence end (or, failing that, the last space) in its final tenth, if any.
+    """
+    end = start + chunk_size
+    if end >= len(text):
+        return len(text)
+    window_start = max(end - chunk_size // 10, start + 1)
+    # str.rfind is a plain C-level scan, no regex needed
+    sentence_end = max(text.rfind(sep, window_start, end) for sep in (". ", "? ", "! "))
+    if sentence_end != -1:
+        return sentence_end + 2
+    space = text.rfind(" ", window_start, end)
+    return space + 1 if space != -1 else end
+
+def chunk_text(text, chunk_size=8000, overlap=0):
+    """
+    Splits a long text into smaller chunks, ending each one at a sentence (or word)
+    boundary where possible. They don't overlap by default; summarization passes
+    the previous chunk's tail along as context instead.
+    """
+    if text is None or not text.strip():
+        return []
+
+    chunks = []
+    start = 0
+    while True:
+        end = _chunk_end(text, start, chunk_size)
+        chunks.append(text[start:end])
+        if end == len(text):
+            return chunks
+        # Never step backwards, even if overlap is larger than a snapped chunk
+        start = max(end - overlap, start + 1)